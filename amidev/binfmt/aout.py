@@ -1,11 +1,11 @@
-from __future__ import print_function, unicode_literals
-
 import logging
 import io
 import os
 import struct
+import sys
 
-from collections import namedtuple, Sequence
+from collections import namedtuple
+from collections.abc import Sequence
 
 from amidev.utils import hexdump
 
@@ -109,6 +109,16 @@ class Stab(namedtuple('Stab',
         _type = cls.inv_type_map.get(_bintype & ~1, 'DEBUG')
         return cls(_str, _type, _ext, _other, _desc, _value)
 
+    @classmethod
+    def decodeList(cls, data, strtab):
+        stringAtOffset = strtab.stringAtOffset
+        type_map = cls.inv_type_map
+        return [cls(stringAtOffset(_stroff),
+                    type_map.get(_bintype & ~1, 'DEBUG'),
+                    _bintype & 1, _other, _desc, _value)
+                for _stroff, _bintype, _other, _desc, _value
+                in struct.iter_unpack('>iBbhI', data)]
+
     def as_string(self):
         visibility = ['l', 'g'][self.ext]
         return '{3:08x} {5} {0:<5} {2:04x} {1:02x} {4}'.format(
@@ -133,7 +143,7 @@ class StringTable(Sequence):
         return item in self._table
 
     def addString(self, offset, text):
-        self._map[offset] = len(self._table)
+        self._map[offset] = text
         self._table.append(text)
 
     @classmethod
@@ -142,17 +152,14 @@ class StringTable(Sequence):
         s = 0
         while True:
             e = data.find(b'\0', s)
-            strings.addString(s + 4, data[s:e].decode('ascii'))
+            strings.addString(s + 4, sys.intern(data[s:e].decode('ascii')))
             if e == -1:
                 break
             s = e + 1
         return strings
 
     def stringAtOffset(self, offset):
-        index = self._map.get(offset)
-        if index is None:
-            return ''
-        return self._table[index]
+        return self._map.get(offset, '')
 
 
 class Aout(object):
@@ -190,8 +197,7 @@ class Aout(object):
 
             self._strings = StringTable.decode(strings)
 
-            for i in range(0, len(symbols), 12):
-                self._symbols.append(Stab.decode(symbols[i:i + 12], self._strings))
+            self._symbols = Stab.decodeList(symbols, self._strings)
 
             for i in range(0, len(text_reloc), 8):
                 self._text_relocs.append(RelocInfo.decode(text_reloc[i:i + 8]))
@@ -1,7 +1,6 @@
-from __future__ import print_function, unicode_literals
-
 import logging
 import io
+import mmap
 import os
 import struct
 import textwrap
@@ -173,9 +172,8 @@ class HunkDebug(Hunk):
             hf.skip(4)
             strtab = hf.read(strtabsize)
 
-            chunks = [symtab[i:i + 12] for i in range(0, symtabsize, 12)]
             strings = StringTable.decode(strtab)
-            stabs = [Stab.decode(chunk, strings) for chunk in chunks]
+            stabs = Stab.decodeList(symtab, strings)
 
             if strtabsize & 3:
                 hf.skip(4 - strtabsize & 3)
@@ -248,7 +246,7 @@ class HunkReloc(Hunk):
         type_, _ = hf.readHunk('HUNK_RELOC32', 'HUNK_RELOC16', 'HUNK_RELOC8',
                                'HUNK_DREL32', 'HUNK_DREL16', 'HUNK_DREL8')
 
-        if hf.type is 'executable' and type_ in ['HUNK_DREL32', 'HUNK_DREL16',
+        if hf.type == 'executable' and type_ in ['HUNK_DREL32', 'HUNK_DREL16',
                                                  'HUNK_DREL8']:
             relocs = hf.readShortRelocs()
         else:
@@ -472,13 +470,38 @@ class HunkIndex(Hunk):
             print('')
 
 
-class HunkFile(io.FileIO):
-    def __init__(self, *args, **kwargs):
-        super(HunkFile, self).__init__(*args, **kwargs)
-
-        self.size = os.path.getsize(self.name)
+class HunkFile(object):
+    def __init__(self, path):
+        self.name = path
+        self.size = os.path.getsize(path)
         self.type = 'object'
 
+        # map the file into memory, so that reading a word or a long
+        # does not turn into a system call
+        with open(path, mode='rb') as fh:
+            if self.size:
+                self._data = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self._data = io.BytesIO()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._data.close()
+
+    def read(self, n=-1):
+        return self._data.read(n)
+
+    def seek(self, pos, whence=os.SEEK_SET):
+        return self._data.seek(pos, whence)
+
+    def tell(self):
+        return self._data.tell()
+
     @contextmanager
     def rollback(self):
         pos = self.tell()
@@ -599,7 +622,7 @@ HunkClassMap = {
 
 
 def ReadFile(path):
-    with HunkFile(path, mode='rb') as hf:
+    with HunkFile(path) as hf:
         hunks = []
         units = 0
 
@@ -609,10 +632,10 @@ def ReadFile(path):
 
             type_ = Hunk.getType(hunkId)
 
-            if type_ is 'HUNK_HEADER':
+            if type_ == 'HUNK_HEADER':
                 hf.type = 'executable'
 
-            if type_ is 'HUNK_UNIT':
+            if type_ == 'HUNK_UNIT':
                 units += 1
                 if units > 1:
                     hf.type = 'library'
@@ -1,4 +1,5 @@
 import asyncio
+import bisect
 import logging
 import os
 
@@ -6,7 +7,6 @@ from prompt_toolkit.patch_stdout import patch_stdout
 from prompt_toolkit.shortcuts import PromptSession
 from prompt_toolkit.history import InMemoryHistory
 
-from .info import Symbol, SourceLine, DebugInfo
 from .state import BreakPoint, Registers
 
 
@@ -19,7 +19,10 @@ class UaeDebugger():
     def __init__(self, uae):
         self.uae = uae
         self.debuginfo = None
+        # breakpoints are kept sorted by address,
+        # _bp_addrs holds their addresses for bisection
         self.breakpoints = []
+        self._bp_addrs = []
         self.registers = Registers()
 
     def address_of(self, where):
@@ -40,12 +43,18 @@ class UaeDebugger():
             return str(self.debuginfo.ask_address(pc))
         return '%08X' % pc
 
-    def break_lookup(self, addr):
-        for bp in self.breakpoints:
-            if bp.address == addr:
-                return addr
+    def break_index(self, addr):
+        i = bisect.bisect_left(self._bp_addrs, addr)
+        if i < len(self._bp_addrs) and self._bp_addrs[i] == addr:
+            return i
         return None
 
+    def break_lookup(self, addr):
+        i = self.break_index(addr)
+        if i is None:
+            return None
+        return self.breakpoints[i]
+
     async def break_show(self, pc):
         print('Stopped at %s:' % self.break_info(pc))
         sl = None
@@ -86,15 +95,18 @@ class UaeDebugger():
         if not await self.uae.insert_hwbreak(addr):
             return
         bp = BreakPoint(addr)
-        self.breakpoints.append(bp)
+        i = bisect.bisect_left(self._bp_addrs, addr)
+        self._bp_addrs.insert(i, addr)
+        self.breakpoints.insert(i, bp)
         print('Added breakpoint #%d, %s' %
               (bp.number, self.break_info(bp.address)))
 
     async def do_break_remove(self, addr):
-        bp = self.break_lookup(addr)
-        if not bp:
+        i = self.break_index(addr)
+        if i is None:
             return
-        self.breakpoints.remove(bp)
+        self._bp_addrs.pop(i)
+        bp = self.breakpoints.pop(i)
         await self.uae.remove_hwbreak(addr)
         print('Removed breakpoint #%d' % bp.number)
 
@@ -104,19 +116,31 @@ class UaeDebugger():
 
     async def do_disassemble_range(self, addr, end):
         while addr < end:
-            line, = await self.uae.disassemble(addr, 1)
-            addr += line.next_address
-            print(line)
+            # fetch many instructions at once to save round-trips to UAE
+            lines = await self.uae.disassemble(addr, 64)
+            if not lines:
+                break
+            for line in lines:
+                if line.address >= end:
+                    return
+                print(line)
+                addr = line.next_address
 
     async def do_info_registers(self):
         print(await self.uae.read_registers())
 
     async def do_debuginfo_read(self, filename):
+        # debug info reader is only needed once an executable is loaded
+        from .info import ReadDebugInfo
+
         segments = await self.uae.fetch_segments()
-        debuginfo = DebugInfo()
-        debuginfo.fromFile(filename)
+        debuginfo = ReadDebugInfo(filename)
         if debuginfo.relocate(segments):
             self.debuginfo = debuginfo
+            # read and highlight sources in a worker thread, so the first
+            # stop does not have to, while the prompt stays responsive
+            loop = asyncio.get_running_loop()
+            loop.run_in_executor(None, debuginfo.loadSources)
         else:
             print('Failed to associate debug info from "%s" '
                   'file with task sections!' % filename)
@@ -131,7 +155,7 @@ class UaeDebugger():
     async def do_debuginfo_symbol(self, symbol):
         try:
             addr = self.debuginfo.ask_symbol(symbol)
-            if addr:
+            if addr is not None:
                 print('Symbol "%s" at %08X.' % (symbol, addr))
             else:
                 print('No symbol "%s" found!' % symbol)
@@ -141,7 +165,7 @@ class UaeDebugger():
     async def do_debuginfo_source_line(self, source, line):
         try:
             addr = self.debuginfo.ask_source_line("%s:%d" % (source, line))
-            if addr:
+            if addr is not None:
                 print('Line "%s:%d" at %08X.' % (source, line, addr))
             else:
                 print('Line "%s:%d" found!' % (source, line))
@@ -181,15 +205,16 @@ class UaeDebugger():
             self.do_where_am_I()
     }
 
-    commands_ignored = ['Z', 'Ze', 'Zs']
+    commands_ignored = {'Z', 'Ze', 'Zs'}
 
     async def do_command(self, cmd):
         fs = cmd.split()
         if not fs:
             return
         op, arg = fs[0], fs[1:]
-        if op in self.commands:
-            await self.commands[op](self, arg)
+        handler = self.commands.get(op)
+        if handler:
+            await handler(self, arg)
         elif op in self.commands_ignored:
             print('Command ignored...')
         else:
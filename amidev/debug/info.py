@@ -1,8 +1,14 @@
+import array
+import bisect
+import hashlib
 import os
 import os.path
+import pickle
 import re
+import sys
+import tempfile
 
-from collections import namedtuple
+from collections import ChainMap, namedtuple
 
 from pygments import highlight
 from pygments.lexers.c_cpp import CLexer
@@ -15,7 +21,12 @@ from amidev.binfmt import hunk
 TheFormatter = Terminal256Formatter(style=get_style_by_name('monokai'))
 
 
-Segment = namedtuple('Segment', 'start size')
+GlobalAttr = ('global',)
+LocalAttr = ('local',)
+LocalFileAttr = ('local', 'file')
+LocalScopeAttr = ('local', 'scope')
+StackAttr = ('stack',)
+RegisterAttr = ('register',)
 
 
 class StabInfoParser():
@@ -40,8 +51,11 @@ class StabInfoParser():
     Info = namedtuple('Info', 'name info')
     TypeDecl = namedtuple('TypeDecl', 'name type')
 
+    __slots__ = ('_data', '_chunks', '_typemap', '_pos')
+
     def __init__(self, typemap):
         self._data = ''
+        self._chunks = []
         self._typemap = typemap
         self._pos = 0
 
@@ -66,14 +80,6 @@ class StabInfoParser():
                              (char, self.rest()[0], self._data))
         self._pos += 1
 
-    def consume(self, regex):
-        m = regex.match(self._data, self._pos)
-        if not m:
-            raise ValueError('Expected "%s" got "%s" in "%s"' %
-                             (regex.pattern, self.rest(), self._data))
-        self._pos = m.end()
-        return m.group(0)
-
     def peek(self, char):
         try:
             last = self._data[self._pos]
@@ -91,86 +97,136 @@ class StabInfoParser():
         self._typemap[n] = v
         return v
 
-    TLabel = re.compile('[A-Za-z0-9_ ]+')
-    TNumber = re.compile('-?[0-9]+')
+    # bound match methods of compiled patterns, called directly
+    matchLabel = re.compile('[A-Za-z0-9_ ]+').match
+    matchNumber = re.compile('-?[0-9]+').match
+    # whole productions that consist of plain numbers only, these let
+    # the regex engine scan the most common cases in a single call
+    matchField = re.compile(
+        '([A-Za-z0-9_ ]+):(-?[0-9]+),(-?[0-9]+),(-?[0-9]+);').match
+    matchRange = re.compile('(-?[0-9]+);(-?[0-9]+);(-?[0-9]+);').match
+
+    @staticmethod
+    def toNumber(number):
+        # octal only if there are more digits after leading zero
+        if number[0] == '0' and len(number) > 1:
+            return int(number, 8)
+        return int(number)
 
     def __Label(self):
-        return self.consume(self.TLabel)
+        m = self.matchLabel(self._data, self._pos)
+        if not m:
+            raise ValueError('Expected label got "%s" in "%s"' %
+                             (self.rest(), self._data))
+        self._pos = m.end()
+        return m.group()
 
     def __Number(self):
-        number = self.consume(self.TNumber)
-        if number[0] == '0':
-            return int(number, 8)
-        return int(number)
+        m = self.matchNumber(self._data, self._pos)
+        if not m:
+            raise ValueError('Expected number got "%s" in "%s"' %
+                             (self.rest(), self._data))
+        self._pos = m.end()
+        return self.toNumber(m.group())
 
     def __Field(self):
+        m = self.matchField(self._data, self._pos)
+        if m:
+            self._pos = m.end()
+            name, typ, offset, size = m.groups()
+            toNumber = self.toNumber
+            return self.Field(name, toNumber(typ), toNumber(offset),
+                              toNumber(size))
+
         name, _ = self.__Label(), self.expect(':')
         typ, _ = self.__TypeDecl(), self.expect(',')
         offset, _ = self.__Number(), self.expect(',')
         size, _ = self.__Number(), self.expect(';')
         return self.Field(name, typ, offset, size)
 
-    def __Type(self):
-        last = self.read()
-
-        if last == 'a':
-            arange = self.__Type()
-            eltype = self.__TypeDecl()
-            return self.ArrayType(arange, eltype)
+    def __ArrayType(self):
+        arange = self.__Type()
+        eltype = self.__TypeDecl()
+        return self.ArrayType(arange, eltype)
 
-        if last == 'r':
+    def __Subrange(self):
+        m = self.matchRange(self._data, self._pos)
+        if m:
+            self._pos = m.end()
+            _of, _lo, _hi = map(self.toNumber, m.groups())
+        else:
             _of, _ = self.__Number(), self.expect(';')
             _lo, _ = self.__Number(), self.expect(';')
             _hi, _ = self.__Number(), self.expect(';')
-            if _lo > 0 and _hi > 0:
-                _lo = -_lo
-            return self.Subrange(_of, _lo, _hi)
-
-        if last == 's':
-            size = self.__Number()
-            fields = []
-            while not self.peek(';'):
-                fields.append(self.__Field())
-            return self.StructType(size, fields)
-
-        if last == 'u':
-            size = self.__Number()
-            fields = []
-            while not self.peek(';'):
-                fields.append(self.__Field())
-            return self.UnionType(size, fields)
-
-        if last == 'f' or last == 'F':
-            return self.FunctionType(self.__Number())
-
-        if last == '*':
-            return self.Pointer(self.__Type())
-
-        if last == 'x':
-            if self.peek('s'):
-                typ = 'struct'
-            elif self.peek('u'):
-                typ = 'union'
-            else:
-                raise ValueError(self.rest())
-            name, _ = self.__Label(), self.expect(':')
-            return self.ForwardDecl(typ, name)
+        if _lo > 0 and _hi > 0:
+            _lo = -_lo
+        return self.Subrange(_of, _lo, _hi)
+
+    def __Fields(self):
+        peek, field = self.peek, self.__Field
+        fields = []
+        while not peek(';'):
+            fields.append(field())
+        return fields
+
+    def __StructType(self):
+        size = self.__Number()
+        return self.StructType(size, self.__Fields())
+
+    def __UnionType(self):
+        size = self.__Number()
+        return self.UnionType(size, self.__Fields())
+
+    def __FunctionType(self):
+        return self.FunctionType(self.__Number())
+
+    def __Pointer(self):
+        return self.Pointer(self.__Type())
+
+    def __ForwardDecl(self):
+        if self.peek('s'):
+            typ = 'struct'
+        elif self.peek('u'):
+            typ = 'union'
+        else:
+            raise ValueError(self.rest())
+        name, _ = self.__Label(), self.expect(':')
+        return self.ForwardDecl(typ, name)
 
-        if last == '@':
-            if self.peek('s'):
-                kind = 'struct'
-            else:
-                raise ValueError(self.rest())
-            size, _, typ = self.__Number(), self.expect(';'), self.__Type()
-            return self.SizeOf(size, typ)
-
-        if last == 'e':
-            entries = []
-            while not self.peek(';'):
-                name, _ = self.__Label(), self.expect(':')
-                value, _ = self.__Number(), self.expect(',')
-                entries.append(self.Entry(name, value))
-            return self.EnumType(entries)
+    def __SizeOf(self):
+        if self.peek('s'):
+            kind = 'struct'
+        else:
+            raise ValueError(self.rest())
+        size, _, typ = self.__Number(), self.expect(';'), self.__Type()
+        return self.SizeOf(size, typ)
+
+    def __EnumType(self):
+        peek, expect = self.peek, self.expect
+        label, number, entry = self.__Label, self.__Number, self.Entry
+        entries = []
+        while not peek(';'):
+            name, _ = label(), expect(':')
+            value, _ = number(), expect(',')
+            entries.append(entry(name, value))
+        return self.EnumType(entries)
+
+    typeParsers = {
+        'a': __ArrayType,
+        'r': __Subrange,
+        's': __StructType,
+        'u': __UnionType,
+        'f': __FunctionType,
+        'F': __FunctionType,
+        '*': __Pointer,
+        'x': __ForwardDecl,
+        '@': __SizeOf,
+        'e': __EnumType}
+
+    def __Type(self):
+        parser = self.typeParsers.get(self.read())
+        if parser:
+            return parser(self)
 
         self.unread()
 
@@ -187,56 +243,83 @@ class StabInfoParser():
                 raise RuntimeError(type(ref), self.rest())
         return ref
 
+    infoParsers = {
+        't': lambda self, name: self.__TypeDecl(),
+        'T': lambda self, name: self.__TypeDecl(),
+        'G': lambda self, name: self.Variable(
+            name, GlobalAttr, self.__TypeDecl()),
+        'S': lambda self, name: self.Variable(
+            name, LocalFileAttr, self.__TypeDecl()),
+        'V': lambda self, name: self.Variable(
+            name, LocalScopeAttr, self.__TypeDecl()),
+        'f': lambda self, name: self.Function(
+            name, LocalAttr, self.__TypeDecl()),
+        'F': lambda self, name: self.Function(
+            name, GlobalAttr, self.__TypeDecl()),
+        'r': lambda self, name: self.Register(name, self.__TypeDecl()),
+        'p': lambda self, name: self.Parameter(
+            name, StackAttr, self.__TypeDecl()),
+        'P': lambda self, name: self.Parameter(
+            name, RegisterAttr, self.__TypeDecl())}
+
     def __Info(self):
         name, _ = self.__Label(), self.expect(':')
 
-        last = self.read()
-
-        if last == 't' or last == 'T':
-            return self.__TypeDecl()
-        if last == 'G':
-            return self.Variable(name, ['global'], self.__TypeDecl())
-        if last == 'S':
-            return self.Variable(name, ['local', 'file'], self.__TypeDecl())
-        if last == 'V':
-            return self.Variable(name, ['local', 'scope'], self.__TypeDecl())
-        if last == 'f':
-            return self.Function(name, ['local'], self.__TypeDecl())
-        if last == 'F':
-            return self.Function(name, ['global'], self.__TypeDecl())
-        if last == 'r':
-            return self.Register(name, self.__TypeDecl())
-        if last == 'p':
-            return self.Parameter(name, ['stack'], self.__TypeDecl())
-        if last == 'P':
-            return self.Parameter(name, ['register'], self.__TypeDecl())
+        parser = self.infoParsers.get(self.read())
+        if parser:
+            return parser(self, name)
 
         self.unread()
 
         return self.__TypeDecl()
 
+    parsed = {}
+
+    @classmethod
+    def parse(cls, s):
+        # Same stab strings (mostly type declarations) repeat across units.
+        # Parse into a private type map, so the result can be cached and
+        # type declarations replayed into type map of each caller.
+        result = cls.parsed.get(s)
+        if result is None:
+            typemap = {}
+            parser = cls(typemap)
+            parser._data = s
+            si = parser.__Info()
+            if parser._pos < len(s):
+                raise ValueError(parser.rest())
+            result = cls.parsed[s] = si, tuple(typemap.items())
+        return result
+
     def get(self):
-        si = self.__Info()
-        if self._pos < len(self._data):
-            raise ValueError(self.rest())
-        self._data = ''
-        self._pos = 0
-        return si
+        data = ''.join(self._chunks)
+        self._chunks = []
+        return self(data)
 
     def feed(self, s):
         if s[-1] == '\\':
-            self._data += s[:-1]
+            self._chunks.append(s[:-1])
             return False
-        self._data += s
+        self._chunks.append(s)
         return True
 
     def __call__(self, s):
-        self._data = s
-        self._pos = 0
-        return self.get()
+        si, types = self.parse(s)
+        self._typemap.update(types)
+        return si
+
+
+# make stab records nested in parser class picklable
+for _type in vars(StabInfoParser).values():
+    if isinstance(_type, type) and issubclass(_type, tuple):
+        _type.__qualname__ = 'StabInfoParser.' + _type.__name__
+        _type.__module__ = __name__
+del _type
 
 
 class Symbol():
+    __slots__ = ('address', 'name')
+
     def __init__(self, address=0, name=''):
         self.address = address
         self.name = name
@@ -247,10 +330,12 @@ class Symbol():
         return self.address < other.address
 
     def __str__(self):
-        return '%08X: %s' % (self.address, self.name)
+        return f'{self.address:08X}: {self.name}'
 
 
 class SourceLine():
+    __slots__ = ('address', 'src_file', 'line', 'symbol')
+
     def __init__(self, address=0, src_file=None, line=0, symbol=None):
         self.address = address
         self.src_file = src_file
@@ -275,28 +360,31 @@ class SourceLine():
         return self.address < other.address
 
     def __str__(self):
-        s = '%08X' % self.address
-        if self.offset == 0:
-            s += ' at <%s>' % self.name
-        else:
-            s += ' at <%s+%d>' % (self.name, self.offset)
+        name, offset = self.name, self.offset
+        where = f'<{name}+{offset}>' if offset else f'<{name}>'
         if self.src_file:
-            s += ' in "%s:%d"' % (self.src_file, self.line)
-        return s
+            return (f'{self.address:08X} at {where} '
+                    f'in "{self.src_file}:{self.line}"')
+        return f'{self.address:08X} at {where}'
 
 
 class SourceFile():
+    __slots__ = ('path', 'typemap', 'parser', 'code')
+
     def __init__(self, path):
         self.path = path
         self.typemap = {}
         self.parser = StabInfoParser(self.typemap)
         self.code = None
 
-    def __getitem__(self, index):
+    def load(self):
         if self.code is None:
-            with open(self.path) as fh:
+            with open(self.path, errors='replace') as fh:
                 formatted = highlight(fh.read(), CLexer(), TheFormatter)
                 self.code = formatted.splitlines()
+
+    def __getitem__(self, index):
+        self.load()
         return self.code[index]
 
     def __str__(self):
@@ -304,17 +392,37 @@ class SourceFile():
 
 
 class Section():
+    __slots__ = ('hunk', 'start', 'size', 'symbols', 'lines',
+                 '_symbol_lines', '_entries', '_addr_index',
+                 '_lines_by_file', '_symbols_by_name')
+
     def __init__(self, h, start=0, size=0):
         self.hunk = h
         self.start = start
         self.size = size
         self.symbols = []
         self.lines = []
+        self._symbol_lines = []
+        self._entries = []
+        self._addr_index = array.array('l')
+        self._lines_by_file = {}
+        self._symbols_by_name = {}
 
     @property
     def end(self):
         return self.start + self.size
 
+    def __getstate__(self):
+        state = {name: getattr(self, name) for name in self.__slots__}
+        # only hunk type is needed, so do not keep section contents
+        if self.hunk is not None:
+            state['hunk'] = hunk.Hunk(self.hunk.type)
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
     def relocate(self, start, size):
         if self.size != size:
             print(self.size, 'vs.', size)
@@ -324,50 +432,97 @@ class Section():
             s.address += diff
         for l in self.lines:
             l.address += diff
+        for l in self._symbol_lines:
+            l.address += diff
+        # order of entries and their offsets within section do not change
         self.start = start
         return True
 
     def cleanup(self, extra_lines):
         # remove multiple symbol definitions for the same address
         # we take symbol name without '_' prefix
-        symbols = sorted(self.symbols)
-        new_symbols = []
-        for i, s in enumerate(symbols):
-            if i + 1 < len(symbols):
-                sn = symbols[i + 1]
-                if s.address == sn.address:
+        by_address = {}
+        for s in self.symbols:
+            by_address.setdefault(s.address, []).append(s)
+        self.symbols = []
+        for address in sorted(by_address):
+            group = by_address[address]
+            if len(group) > 1:
+                group.sort(key=lambda s: s.name)
+                for s, sn in zip(group, group[1:]):
                     if sn.name == '_' + s.name:
                         sn.name = s.name
-                    continue
-            new_symbols.append(s)
-        self.symbols = new_symbols
+            self.symbols.append(group[-1])
 
         # common symbols have their source + line information,
         # but must be matched with actual definitions in DATA and BSS sections
+        by_name = {}
+        by_stripped = {}
+        for i, s in enumerate(self.symbols):
+            by_name.setdefault(s.name, []).append((i, s))
+            by_stripped.setdefault(s.name[1:], []).append((i, s))
         for el in extra_lines:
-            for s in self.symbols:
-                if s.name == el.name or s.name[1:] == el.name:
+            found = sorted(by_name.get(el.name, []) +
+                           by_stripped.get(el.name, []))
+            for i, s in found:
+                if s.name != el.name:
+                    by_name[s.name].remove((i, s))
+                    by_stripped[s.name[1:]].remove((i, s))
                     s.name = el.name
-                    sl = SourceLine(s.address, el.src_file, el.line, s)
-                    self.lines.append(sl)
-        self.lines = sorted(self.lines)
+                    by_name.setdefault(s.name, []).append((i, s))
+                    by_stripped.setdefault(s.name[1:], []).append((i, s))
+                sl = SourceLine(s.address, el.src_file, el.line, s)
+                self.lines.append(sl)
+        self.lines.sort(key=lambda l: (l.address, l.name))
+        self._reindex()
+
+        # symbols keep their names from now on, so that index is stable
+        self._symbols_by_name = {}
+        for s in self.symbols:
+            self._symbols_by_name.setdefault(s.name, s)
+
+        # source lines grouped by file name and ordered by line number
+        by_file = {}
+        for sl in self.lines:
+            if sl.src_file:
+                name = os.path.basename(sl.src_file.path)
+                by_file.setdefault(name, []).append(sl)
+        self._lines_by_file = {}
+        for name, lines in by_file.items():
+            lines.sort(key=lambda sl: (sl.line, sl.address))
+            self._lines_by_file[name] = ([sl.line for sl in lines], lines)
+
+    def _reindex(self):
+        # merge symbols and lines into a single list sorted by address,
+        # source lines come before symbols, and the first entry at given
+        # address is the one reported by lookup
+        self._symbol_lines = [SourceLine(address=s.address, symbol=s)
+                              for s in self.symbols]
+        self._entries = sorted(self.lines + self._symbol_lines,
+                               key=lambda e: e.address)
+        self._addr_index = array.array(
+            'l', [e.address - self.start for e in self._entries])
 
     def ask_address(self, addr):
         if self.has_address(addr):
-            symbols = [SourceLine(address=s.address, symbol=s)
-                       for s in self.symbols]
-            lines = filter(lambda sl: sl.address <= addr, self.lines + symbols)
-            return max(lines, key=lambda e: e.address)
+            index = self._addr_index
+            i = bisect.bisect_right(index, addr - self.start)
+            if i:
+                return self._entries[bisect.bisect_left(index, index[i - 1])]
 
     def ask_symbol(self, name):
-        for s in self.symbols:
-            if s.name == name:
-                return s.address
+        s = self._symbols_by_name.get(name)
+        if s:
+            return s.address
 
     def ask_source_line(self, path, line):
-        for sl in self.lines:
-            if os.path.basename(sl.src_file.path) and sl.line >= line:
-                return sl.address
+        try:
+            numbers, lines = self._lines_by_file[os.path.basename(path)]
+        except KeyError:
+            return None
+        i = bisect.bisect_left(numbers, line)
+        if i < len(numbers):
+            return lines[i].address
 
     def has_address(self, addr):
         return self.start <= addr and addr < self.end
@@ -389,6 +544,8 @@ Scope = namedtuple('Scope', 'begin end values')
 
 
 class Function():
+    __slots__ = ('symbol', '_scopes', '_begin', '_end')
+
     def __init__(self):
         self.symbol = Symbol()
 
@@ -400,12 +557,7 @@ class Function():
         self._scopes.append(Scope(addr, 0, {}))
 
     def leaveScope(self, addr):
-        vardict = {}
-        for scope in reversed(self._scopes):
-            for n, v in scope.values.items():
-                if n in vardict:
-                    continue
-                vardict[n] = v
+        vardict = ChainMap(*[scope.values for scope in reversed(self._scopes)])
         s = self._scopes.pop()
         return s._replace(end=addr, values=vardict)
 
@@ -413,19 +565,152 @@ class Function():
         self._scopes[-1].values[n] = v
 
 
-class DebugInfo():
+class StabReader():
+    __slots__ = ('debuginfo', 'last', 'code', 'func', 'dirname', 'filename',
+                 'source')
+
+    def __init__(self, debuginfo, last):
+        self.debuginfo = debuginfo
+        self.last = last
+        self.code = last['CODE']
+        self.func = Function()
+        self.dirname = ''
+        self.filename = ''
+        self.source = None
+
+    def read(self, stabs):
+        get_handler = self.handlers.get
+        for st in stabs:
+            handler = get_handler(st.type)
+            if handler is None:
+                raise ValueError('%s: not handled!' % st.type)
+            handler(self, st)
+
     stab_to_section = {'GSYM': 'COMMON', 'STSYM': 'DATA', 'LCSYM': 'BSS'}
 
+    # N_SO: path and name of source file
+    # N_SOL: name of include file
+    def onSourceFile(self, st):
+        if st.str[-1] == '/':
+            self.dirname = st.str
+        else:
+            if st.str[0] == '/':
+                self.filename = st.str
+            else:
+                self.filename = sys.intern(self.dirname + st.str)
+            if st.type == 'SO':
+                self.source = SourceFile(self.filename)
+                self.debuginfo.files.append(self.source)
+
+    # N_DATA: data symbol
+    # N_BSS: BSS symbol
+    def onSymbol(self, st):
+        s = Symbol(st.value, st.str)
+        self.last[st.type].symbols.append(s)
+
+    # N_GSYM: global symbol
+    # N_STSYM: data segment file-scope variable
+    # N_LCSYM: BSS segment file-scope variable
+    def onGlobalSymbol(self, st):
+        source = self.source
+        if source.parser.feed(st.str):
+            si = source.parser.get()
+            s = Symbol(st.value, sys.intern(si.name))
+            sl = SourceLine(st.value, source, st.desc, s)
+            sec = self.last[self.stab_to_section[st.type]]
+            sec.symbols.append(s)
+            sec.lines.append(sl)
+
+    # N_LSYM: stack variable or type
+    def onLocalSymbol(self, st):
+        if self.source.parser.feed(st.str):
+            si = self.source.parser.get()
+
+    # N_SLINE: line number in text segment
+    def onSourceLine(self, st):
+        # address, path, line, symbol
+        sl = SourceLine(st.value, self.source, st.desc, self.func.symbol)
+        self.code.lines.append(sl)
+
+    # N_FUN: function name or text segment variable
+    def onFunction(self, st):
+        si = self.source.parser(st.str)
+        func = self.func
+        func.symbol.address = st.value
+        func.symbol.name = sys.intern(si.name)
+        self.code.symbols.append(func.symbol)
+        self.func = Function()
+
+    def onText(self, st):
+        pass
+
+    def onLeftBracket(self, st):
+        self.func.enterScope(st.value)
+
+    def onRightBracket(self, st):
+        varlst = self.func.leaveScope(st.value)
+        # print(varlst)
+
+    # N_RSYM: register variable
+    # N_PSYM: parameter variable
+    def onVariable(self, st):
+        if self.source.parser.feed(st.str):
+            si = self.source.parser.get()
+            # print('Param(line=%d name="%s" value=%d type=%d)'
+            #       % (st.desc, si.name, st.value, si.type))
+            self.func.add(si.name, si.type)
+
+    handlers = {
+        'SO': onSourceFile,
+        'SOL': onSourceFile,
+        'DATA': onSymbol,
+        'BSS': onSymbol,
+        'GSYM': onGlobalSymbol,
+        'STSYM': onGlobalSymbol,
+        'LCSYM': onGlobalSymbol,
+        'LSYM': onLocalSymbol,
+        'SLINE': onSourceLine,
+        'FUN': onFunction,
+        'TEXT': onText,
+        'LBRAC': onLeftBracket,
+        'RBRAC': onRightBracket,
+        'RSYM': onVariable,
+        'PSYM': onVariable
+    }
+
+
+class DebugInfo():
+    __slots__ = ('sections', 'files', '_sl_cache', '_section_starts',
+                 '_sorted_sections', '_symbols_by_name')
+
     def __init__(self):
         self.sections = []
         self.files = []
+        self._sl_cache = {}
+        self._section_starts = []
+        self._sorted_sections = []
+        self._symbols_by_name = {}
+
+    def _reindex(self):
+        # sections do not overlap, so the one with greatest start address
+        # not above a given address is the only one that may contain it
+        self._sorted_sections = sorted(self.sections,
+                                       key=lambda s: (s.start, s.size))
+        self._section_starts = [s.start for s in self._sorted_sections]
+        # first definition of a name wins, like in Section.ask_symbol
+        self._symbols_by_name = {}
+        for section in self.sections:
+            for s in section.symbols:
+                self._symbols_by_name.setdefault(s.name, s)
 
     def relocate(self, segments):
         if len(self.sections) != len(segments):
             return False
+        self._sl_cache = {}
         for sec, seg in zip(self.sections, segments):
             if not sec.relocate(seg.start, seg.size):
                 return False
+        self._reindex()
         return True
 
     def dump(self):
@@ -433,21 +718,24 @@ class DebugInfo():
             section.dump()
 
     def ask_address(self, addr):
-        for section in self.sections:
-            line = section.ask_address(addr)
-            if line:
-                return line
+        i = bisect.bisect_right(self._section_starts, addr)
+        if i:
+            return self._sorted_sections[i - 1].ask_address(addr)
 
     def ask_variables(self, addr):
         pass
 
     def ask_symbol(self, name):
-        for section in self.sections:
-            addr = section.ask_symbol(name)
-            if addr:
-                return addr
+        s = self._symbols_by_name.get(name)
+        if s:
+            return s.address
 
     def ask_source_line(self, where):
+        try:
+            return self._sl_cache[where]
+        except KeyError:
+            pass
+
         path, line = '', 0
 
         try:
@@ -456,10 +744,21 @@ class DebugInfo():
         except ValueError:
             return
 
+        result = None
         for section in self.sections:
             addr = section.ask_source_line(path, line)
-            if addr:
-                return addr
+            if addr is not None:
+                result = addr
+                break
+        self._sl_cache[where] = result
+        return result
+
+    def loadSources(self):
+        for source in self.files:
+            try:
+                source.load()
+            except OSError:
+                pass
 
     def fromFile(self, executable):
         common = Section(None)
@@ -476,102 +775,70 @@ class DebugInfo():
                 last[h.type[5:]] = sec
                 self.sections.append(sec)
 
-            elif h.type is 'HUNK_SYMBOL':
+            elif h.type == 'HUNK_SYMBOL':
+                append = self.sections[-1].symbols.append
                 for s in h.symbols:
                     address, name = s.refs + start, s.name
                     if name[0] == '_':
                         name = name[1:]
-                    self.sections[-1].symbols.append(Symbol(address, name))
-
-            elif h.type is 'HUNK_DEBUG':
-                stabs = h.data
-
-                # h.dump()
-
-                func = Function()
-                dirname = ''
-                filename = ''
-                source = None
-
-                for st in stabs:
-                    # N_SO: path and name of source file
-                    # N_SOL: name of include file
-                    if st.type in ['SO', 'SOL']:
-                        if st.str[-1] == '/':
-                            dirname = st.str
-                        else:
-                            if st.str[0] == '/':
-                                filename = st.str
-                            else:
-                                filename = dirname + st.str
-                            if st.type == 'SO':
-                                source = SourceFile(filename)
-
-                    # N_DATA: data symbol
-                    # N_BSS: BSS symbol
-                    elif st.type in ['DATA', 'BSS']:
-                        s = Symbol(st.value, st.str)
-                        last[st.type].symbols.append(s)
-
-                    # N_GSYM: global symbol
-                    # N_STSYM: data segment file-scope variable
-                    # N_LCSYM: BSS segment file-scope variable
-                    elif st.type in ['GSYM', 'STSYM', 'LCSYM']:
-                        if source.parser.feed(st.str):
-                            si = source.parser.get()
-                            s = Symbol(st.value, si.name)
-                            sl = SourceLine(st.value, source, st.desc, s)
-                            sec = last[DebugInfo.stab_to_section[st.type]]
-                            sec.symbols.append(s)
-                            sec.lines.append(sl)
-
-                    # N_LSYM: stack variable or type
-                    elif st.type in ['LSYM']:
-                        if source.parser.feed(st.str):
-                            si = source.parser.get()
-
-                    # N_SLINE: line number in text segment
-                    elif st.type in ['SLINE']:
-                        # address, path, line, symbol
-                        sl = SourceLine(st.value, source, st.desc, func.symbol)
-                        last['CODE'].lines.append(sl)
-
-                    # N_FUN: function name or text segment variable
-                    elif st.type in ['FUN']:
-                        si = source.parser(st.str)
-                        func.symbol.address = st.value
-                        func.symbol.name = si.name
-                        last['CODE'].symbols.append(func.symbol)
-                        func = Function()
-
-                    elif st.type in ['TEXT']:
-                        pass
-
-                    elif st.type in ['LBRAC']:
-                        func.enterScope(st.value)
-
-                    elif st.type in ['RBRAC']:
-                        varlst = func.leaveScope(st.value)
-                        # print(varlst)
-
-                    # N_RSYM: register variable
-                    elif st.type in ['RSYM']:
-                        if source.parser.feed(st.str):
-                            si = source.parser.get()
-                            # print('ParamReg(line=%d name="%s" num=%d type=%d)'
-                            #       % (st.desc, si.name, st.value, si.type))
-                            func.add(si.name, si.type)
-
-                    # N_PSYM: parameter variable
-                    elif st.type in ['PSYM']:
-                        if source.parser.feed(st.str):
-                            si = source.parser.get()
-                            # print('ParamStk(line=%d name="%s" off=%d type=%d)'
-                            #       % (st.desc, si.name, st.value, si.type))
-                            func.add(si.name, si.type)
-
-                    else:
-                        raise ValueError('%s: not handled!', st.type)
+                    append(Symbol(address, sys.intern(name)))
+
+            elif h.type == 'HUNK_DEBUG':
+                StabReader(self, last).read(h.data)
 
         for section in self.sections:
             section.cleanup(common.lines)
+
+        self._reindex()
+
+
+# bump whenever layout of pickled debug info changes
+CacheFormat = 2
+
+CacheDir = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+    'amidev')
+
+
+def ReadDebugInfo(path):
+    # Debug info of an executable is pickled into cache directory, so it
+    # does not have to be parsed again until the executable changes.
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    stamp = (CacheFormat, st.st_mtime_ns, st.st_size)
+    name = hashlib.sha1(path.encode()).hexdigest() + '.pickle'
+    cache_path = os.path.join(CacheDir, name)
+
+    try:
+        with open(cache_path, 'rb') as f:
+            if pickle.load(f) == stamp:
+                return pickle.load(f)
+    except FileNotFoundError:
+        pass
+    except Exception:
+        # truncated or otherwise damaged cache entry is just a miss
+        try:
+            os.unlink(cache_path)
+        except OSError:
+            pass
+
+    debuginfo = DebugInfo()
+    debuginfo.fromFile(path)
+
+    # concurrent sessions must not write to the same temporary file
+    tmp_path = None
+    try:
+        os.makedirs(CacheDir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=CacheDir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(stamp, f)
+            pickle.dump(debuginfo, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except Exception:
+        if tmp_path is not None:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    return debuginfo
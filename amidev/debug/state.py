@@ -1,14 +1,16 @@
-def unique():
-    number = 0
-    while True:
-        number += 1
-        yield number
+import itertools
+
+from collections import namedtuple
+
+
+Segment = namedtuple('Segment', 'start size')
+
 
 class BreakPoint():
-    unique_number = unique()
+    unique_number = itertools.count(1)
 
     def __init__(self, address):
-        self.number = self.unique_number.send(None)
+        self.number = next(self.unique_number)
         self.address = address
 
     def __lt__(self, other):
@@ -23,19 +25,22 @@ class Registers():
              'A0', 'A1', 'A2', 'A3', 'A4', 'A5', 'A6', 'A7',
              'PC', 'USP', 'ISP', 'SR']
 
+    __slots__ = names
+
     def __init__(self, **kwargs):
-        self._regs = {}
         for n in self.names:
-            self._regs[n] = kwargs.get(n, 0)
+            setattr(self, n, kwargs.get(n, 0))
 
     def __getitem__(self, name):
-        return self._regs[name]
+        return getattr(self, name)
 
     def __setitem__(self, name, value):
-        self._regs[name] = int(value)
+        # registers of other processor models (e.g. VBR) are not tracked
+        if name in self.__slots__:
+            setattr(self, name, int(value))
 
     def _printable(self, name):
-        val = self._regs.get(name)
+        val = getattr(self, name)
         if name == 'SR':
             return '{}={:04X}'.format(name, val)
         return '{}={:08X}'.format(name, val)
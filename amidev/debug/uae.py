@@ -1,16 +1,35 @@
 import asyncio
+import re
 import signal
 
-from .info import Segment
-from .state import Registers
+from collections import OrderedDict
+
+from .state import Registers, Segment
+
+
+HexDumpLine = re.compile(r'^ *[0-9A-Fa-f]{8}((?: [0-9A-Fa-f]{4}){1,8})', re.M)
+RegisterValue = re.compile(r'([A-Z][A-Z0-9]*) +([0-9A-Fa-f]+)')
+StatusFlag = re.compile(r'([A-Z]+)=([0-9]+)')
+# opcode words are lower case, so they never swallow the mnemonic
+Disassembly = re.compile(r' *([0-9A-Fa-f]{8}) ((?:[0-9a-f]{4} )+) *(.*)')
+
+# memory reads are served from a small cache of aligned blocks
+MemoryBlockSize = 64
+MemoryCacheSize = 64
 
 
 def ParseStatusRegister(line):
-    T, S, M, X, N, Z, V, C, IMASK, STP = \
-            [f.split('=')[1] for f in line.split()]
-    SR_HI = '{:02b}{}{}0{:03b}'.format(int(T), S, M, int(IMASK))
-    SR_LO = '000{}{}{}{}{}'.format(X, N, Z, V, C)
-    return int(SR_HI + SR_LO, 2)
+    # trace mode is printed as two binary digits (T1 T0)
+    flags = dict(StatusFlag.findall(line))
+    return (int(flags['T'], 2) << 14 |
+            int(flags['S']) << 13 |
+            int(flags['M']) << 12 |
+            int(flags['IMASK']) << 8 |
+            int(flags['X']) << 4 |
+            int(flags['N']) << 3 |
+            int(flags['Z']) << 2 |
+            int(flags['V']) << 1 |
+            int(flags['C']))
 
 
 def ParseProcessorState(lines):
@@ -25,8 +44,7 @@ def ParseProcessorState(lines):
     # 'A4 00D00000   A5 00FC0208   A6 00C00276   A7 00040000'
     # 'USP  00000000 ISP  00040000'
     while not lines[0].startswith('T='):
-        l = lines.pop(0).split()
-        for n, v in zip(l[0::2], l[1::2]):
+        for n, v in RegisterValue.findall(lines.pop(0)):
             regs[n] = int(v, 16)
 
     # We are at line starting with 'T=' so read Status Register.
@@ -68,7 +86,7 @@ class DisassemblyLine():
 
     @property
     def next_address(self):
-        return self.address + len(self.opcode) / 2
+        return self.address + len(self.opcode) // 2
 
     def __str__(self):
         return '%08X %-32s %s' % (self.address, self.opcode, self.mnemonic)
@@ -77,6 +95,7 @@ class DisassemblyLine():
 class UaeProcess():
     def __init__(self, proc):
         self.proc = proc
+        self.memory = OrderedDict()
 
     @property
     def reader(self):
@@ -100,21 +119,27 @@ class UaeProcess():
         return await self.recv()
 
     def send(self, cmd):
+        # anything but memory dump or disassembly may change memory
+        if not cmd.startswith(('m ', 'd ')):
+            self.memory.clear()
         self.writer.write(cmd.encode() + b'\n')
 
     async def recv(self):
-        text = ''
+        data = bytearray()
 
+        # read whole reply up to debugger prompt at once
         while True:
             try:
-                raw_text = await self.reader.readuntil(b'>')
-            except asyncio.streams.IncompleteReadError as ex:
+                data += await self.reader.readuntil(b'\n>')
+                break
+            except asyncio.LimitOverrunError as ex:
+                # reply exceeds stream buffer, take what is there already
+                data += await self.reader.readexactly(ex.consumed)
+            except asyncio.IncompleteReadError:
                 raise EOFError
-            text += raw_text.decode()
-            # finished by debugger prompt ?
-            if text.endswith('\n>'):
-                text = text[:-2]
-                return [line.rstrip() for line in text.splitlines()]
+
+        text = data[:-2].decode()
+        return [line.rstrip() for line in text.splitlines()]
 
     def resume(self):
         self.send('g')
@@ -138,28 +163,54 @@ class UaeProcess():
         # 00000004 00C0 0276 00FC 0818 00FC 081A 00FC 081C  ...v............'
         # 00000014 00FC 081E 00FC 0820 00FC 0822 00FC 090E  ....... ..."....'
         # ...
-        lines = await self.communicate('m %x %d' % (addr, (length + 15) / 16))
-        hexlines = [''.join(line.split()[1:9]) for line in lines]
-        return ''.join(hexlines)[:length*2]
+        lines = await self.communicate('m %x %d' % (addr, (length + 15) // 16))
+        hexdump = ''.join(HexDumpLine.findall('\n'.join(lines)))
+        return hexdump.replace(' ', '')[:length*2]
+
+    async def read_block(self, addr):
+        block = self.memory.get(addr)
+        if block is None:
+            hexdump = await self.read_memory(addr, MemoryBlockSize)
+            block = bytes.fromhex(hexdump)
+            # never decode nor keep a partial dump
+            if len(block) < MemoryBlockSize:
+                raise ValueError('Short memory read at %08X: %d bytes' %
+                                 (addr, len(block)))
+            self.memory[addr] = block
+            if len(self.memory) > MemoryCacheSize:
+                self.memory.popitem(last=False)
+        else:
+            self.memory.move_to_end(addr)
+        return block
+
+    async def read_cached(self, addr, size):
+        start = addr & ~(MemoryBlockSize - 1)
+        offset = addr - start
+        data = await self.read_block(start)
+        if offset + size > MemoryBlockSize:
+            data += await self.read_block(start + MemoryBlockSize)
+        return int.from_bytes(data[offset:offset + size], 'big')
 
     async def read_byte(self, addr):
-        return int(await self.read_memory(addr, 1), 16)
+        return await self.read_cached(addr, 1)
 
     async def read_word(self, addr):
-        return int(await self.read_memory(addr, 2), 16)
+        return await self.read_cached(addr, 2)
 
     async def read_long(self, addr):
-        return int(await self.read_memory(addr, 4), 16)
+        return await self.read_cached(addr, 4)
 
     async def disassemble(self, addr, n=1):
         # 00FC10BC 33fc 4000 00df f09a      MOVE.W #$4000,$00dff09a
         lines = await self.communicate('d %x %d' % (addr, n))
         disassembly = []
         for line in lines:
-            pc = int(line[:8].strip(), 16)
-            op = ''.join(line[8:34].strip().split()).upper()
-            ins = line[34:].strip()
-            disassembly.append(DisassemblyLine(pc, op, ins))
+            m = Disassembly.match(line)
+            if m is None:
+                raise ValueError('Malformed disassembly: %r' % line)
+            pc, op, ins = m.groups()
+            op = op.replace(' ', '').upper()
+            disassembly.append(DisassemblyLine(int(pc, 16), op, ins.rstrip()))
         return disassembly
 
     async def prologue(self):
@@ -3,16 +3,24 @@
 import argparse
 import asyncio
 import logging
+import os
 import signal
 import sys
 
-from prompt_toolkit.eventloop import use_asyncio_event_loop
 
-from amidev.debug.uae import UaeProcess
-from amidev.debug.debug import UaeDebugger
+async def UaeLaunch(args):
+    # Heavy modules are imported here, so that '--help' or invalid
+    # arguments are reported without loading prompt_toolkit.
+    from prompt_toolkit.eventloop import use_asyncio_event_loop
 
+    from amidev.debug.uae import UaeProcess
+    from amidev.debug.debug import UaeDebugger
+
+    loop = asyncio.get_running_loop()
+
+    # Tell prompt_toolkit to use asyncio for the event loop.
+    use_asyncio_event_loop(loop)
 
-async def UaeLaunch(loop, args):
     # Create the subprocess, redirect the standard I/O to respective pipes
     uaeproc = UaeProcess(
             await asyncio.create_subprocess_exec(
@@ -21,6 +29,13 @@ async def UaeLaunch(loop, args):
                 stdout=asyncio.subprocess.DEVNULL,
                 stderr=asyncio.subprocess.PIPE))
 
+    # Optionally keep the debugger on one core, leaving the others to FS-UAE.
+    # It is done after FS-UAE was spawned, so it does not inherit the mask.
+    if (os.environ.get('AMIDEV_PIN_CPU') == '1' and
+            hasattr(os, 'sched_setaffinity')):
+        cpus = sorted(os.sched_getaffinity(0))
+        os.sched_setaffinity(0, {cpus[0]})
+
     uaedbg = UaeDebugger(uaeproc)
 
     # Terminate FS-UAE when connection with terminal is broken
@@ -34,29 +49,30 @@ async def UaeLaunch(loop, args):
 
 
 def main():
-    # Tell prompt_toolkit to use asyncio for the event loop.
-    use_asyncio_event_loop()
-
-    logging.basicConfig(level=logging.INFO,
-                        format='%(levelname)s: %(message)s')
-    # logging.getLogger('asyncio').setLevel(logging.DEBUG)
-
-    if sys.platform == 'win32':
-        loop = asyncio.ProactorEventLoop()
-        asyncio.set_event_loop(loop)
-    else:
-        loop = asyncio.get_event_loop()
-    # loop.set_debug(True)
-
     parser = argparse.ArgumentParser(
             description='Run FS-UAE with enabled console debugger.')
     parser.add_argument('params', nargs='*', type=str,
                         help='Parameters passed to FS-UAE emulator.')
     args = parser.parse_args()
 
-    uae = UaeLaunch(loop, args.params)
-    loop.run_until_complete(uae)
-    loop.close()
+    if sys.platform == 'win32':
+        # Subprocess pipes on Windows require proactor event loop.
+        if hasattr(asyncio, 'WindowsProactorEventLoopPolicy'):
+            asyncio.set_event_loop_policy(
+                    asyncio.WindowsProactorEventLoopPolicy())
+    else:
+        # Use faster libuv based event loop if available.
+        try:
+            import uvloop
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        except ImportError:
+            pass
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(levelname)s: %(message)s')
+    # logging.getLogger('asyncio').setLevel(logging.DEBUG)
+
+    asyncio.run(UaeLaunch(args.params))
 
 
 if __name__ == "__main__":
@@ -1,6 +1,3 @@
-from __future__ import print_function, unicode_literals
-
-
 def to_ascii(a):
     b = bytearray(a)
     for i in range(len(b)):
@@ -6,6 +6,24 @@ import sys
 
 from setuptools import setup, find_packages
 
+# Compile debug info and executable parsers if Cython is available.
+# Modules with coroutines must stay pure Python. PyPy runs pure Python
+# faster with its JIT than through extension modules.
+ext_modules = []
+if sys.implementation.name != 'pypy':
+    try:
+        from Cython.Build import cythonize
+        ext_modules = cythonize(['amidev/debug/info.py',
+                                 'amidev/binfmt/hunk.py',
+                                 'amidev/binfmt/aout.py'],
+                                build_dir='build',
+                                compiler_directives={'language_level': 3})
+        # fall back to pure Python if there is no working C compiler
+        for ext in ext_modules:
+            ext.optional = True
+    except ImportError:
+        pass
+
 scripts = {
   'console_scripts' : [
     'dumphunk = amidev.dumphunk:main',
@@ -27,12 +45,23 @@ setup(
         "Development Status :: 4 - Beta",
         "Intended Audience :: Developers",
         "Programming Language :: Python",
+        "Programming Language :: Python :: 3",
+        "Programming Language :: Python :: 3 :: Only",
+        "Programming Language :: Python :: 3.8",
+        "Programming Language :: Python :: 3.9",
+        "Programming Language :: Python :: 3.10",
+        "Programming Language :: Python :: 3.11",
+        "Programming Language :: Python :: 3.12",
         "Topic :: System :: Emulators",
     ],
     license = "License :: OSI Approved :: BSD License",
-    packages = find_packages(),
+    python_requires = '>=3.8',
+    packages = find_packages(include=['amidev', 'amidev.*']),
+    ext_modules = ext_modules,
     zip_safe = False,
     entry_points = scripts,
-    include_package_data=True
+    extras_require = {
+        'uvloop': ['uvloop; platform_system != "Windows"'],
+    }
 )
 